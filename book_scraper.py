@@ -4,26 +4,50 @@ Book Scraper for Books to Scrape Website
 
 This script scrapes book data from http://books.toscrape.com/
 including title, price, rating, availability, and product URL.
-It handles pagination to scrape all books across all pages.
+It handles pagination to scrape all books across all pages, fetching the
+catalogue pages concurrently with aiohttp.
 
 Author: Data Analyst
 Date: 2024
 """
 
+import asyncio
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 import csv
 import logging
+import os
+import re
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from urllib.parse import urljoin, urlparse
-from typing import List, Dict, Optional
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+try:
+    # Optional: selectolax's lexbor backend parses and queries the tree in C
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    # Optional: on-disk HTTP cache used with BookScraper(cache=True)
+    import requests_cache
+except ImportError:
+    requests_cache = None
 
 # Configure logging to track errors and progress
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('scraper.log'),
+        logging.FileHandler('scraper.log', delay=True),  # Opened on the first record
         logging.StreamHandler()
     ]
 )
@@ -31,6 +55,240 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class Book(NamedTuple):
+    """
+    A single scraped book
+    
+    Field names match the CSV columns, so a Book can be written directly as
+    a CSV row. Missing values are None.
+    """
+    Title: str
+    Price: Optional[float]
+    Rating: Optional[int]
+    Availability: Optional[str]
+    URL: Optional[str]
+
+
+# Columns of the generated CSV file, in order
+CSV_FIELDNAMES = list(Book._fields)
+
+# Only the book articles and the 'current'/'next' pagination items are needed
+# from each page, so BeautifulSoup can skip building the rest of the document
+_PAGE_STRAINER = SoupStrainer(class_=['product_pod', 'current', 'next'])
+
+# Matches the pagination label, e.g. "Page 1 of 50"
+_PAGE_COUNT_RE = re.compile(r'Page\s+\d+\s+of\s+(\d+)')
+
+# Maps the rating word used in the 'star-rating' CSS class to its numeric value
+_RATING_MAP = {
+    'One': 1,
+    'Two': 2,
+    'Three': 3,
+    'Four': 4,
+    'Five': 5
+}
+
+# Anything urljoin would clean up or treat specially in a link: whitespace and
+# control characters, scheme/params/query/fragment markers, '//', '.' and '..'
+# segments, and root-relative paths
+_UNPLAIN_LINK_RE = re.compile(r'[\x00-\x20\x7f:;?#]|//|(?:^|/)\.\.?(?:/|$)|^/')
+
+# Characters urljoin strips or validates in the host of a base URL
+_UNPLAIN_HOST_RE = re.compile(r'[\x00-\x20\x7f\[\]]')
+
+# How many times a concurrent fetch is retried after a 429/503 response
+_MAX_RATE_LIMIT_RETRIES = 3
+
+# Longest Retry-After (in seconds) that is waited for; above it the request is dropped
+_MAX_RETRY_AFTER = 60
+
+
+@lru_cache(maxsize=64)
+def _url_directory(url: str) -> Optional[str]:
+    """
+    Return the part of an absolute URL that plain relative links are appended to
+    
+    For 'http://books.toscrape.com/catalogue/page-2.html' this is
+    'http://books.toscrape.com/catalogue/'.
+    
+    Args:
+        url (str): Absolute URL of the page
+        
+    Returns:
+        str: URL up to and including the last '/', or None if the URL is not
+            plain http(s), has no path, has a query or fragment, or has a
+            host or path urljoin would normalise (urljoin is needed then)
+    """
+    scheme_end = url.find('://')
+    if scheme_end == -1 or '?' in url or '#' in url:
+        return None
+    if url[:scheme_end] not in ('http', 'https'):
+        return None  # urljoin lower-cases the scheme and leaves other schemes alone
+    path_start = url.find('/', scheme_end + 3)
+    if path_start == -1 or _UNPLAIN_LINK_RE.search(url, path_start):
+        return None
+    if _UNPLAIN_HOST_RE.search(url, scheme_end + 3, path_start):
+        return None
+    return url[:url.rfind('/') + 1]
+
+
+def _join_url(base_url: str, relative_url: str) -> str:
+    """
+    Resolve a link against a page URL, like urljoin
+    
+    The site's links are plain relative paths such as 'catalogue/page-2.html'
+    or 'a-light-in-the-attic_1000/index.html', which resolve to the page's
+    directory plus the link. Those are built by string concatenation. Anything
+    urljoin would clean up or resolve differently (surrounding or embedded
+    whitespace, '.' and '..' segments, '//', ';' params, absolute,
+    root-relative or query-only links, and bases that are not plain
+    lower-case http(s) URLs) falls back to urljoin.
+    
+    Args:
+        base_url (str): Absolute URL of the page containing the link
+        relative_url (str): The link's href
+        
+    Returns:
+        str: Absolute URL
+    """
+    directory = _url_directory(base_url)
+    if directory is None or not relative_url or _UNPLAIN_LINK_RE.search(relative_url):
+        return urljoin(base_url, relative_url)
+    return directory + relative_url
+
+
+def _parse_price(text: str) -> float:
+    """
+    Convert a price such as '£51.77' to a float
+    
+    The site always puts the '£' symbol first, so it is sliced off instead of
+    building a new string with replace(). Other formats fall back to removing
+    the symbol wherever it is.
+    
+    Args:
+        text (str): Price text from the page
+        
+    Returns:
+        float: The price
+        
+    Raises:
+        ValueError: If the text is not a valid price
+    """
+    if text and text[0] == '£':
+        return float(text[1:])
+    return float(text.replace('£', ''))
+
+
+def _retry_after_seconds(value: Optional[str], attempt: int) -> float:
+    """
+    Convert a Retry-After header into a delay in seconds
+    
+    Args:
+        value (str): Value of the Retry-After header, if any
+        attempt (int): Number of the failed attempt, used for the fallback backoff
+        
+    Returns:
+        float: Seconds to wait before retrying
+    """
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            # Retry-After may also be an HTTP date
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    
+    # Exponential backoff: 0.5s, 1s, 2s, ...
+    return 0.5 * (2 ** attempt)
+
+
+class _CappedRetry(Retry):
+    """
+    urllib3 Retry policy that gives up on a long Retry-After
+    
+    urllib3 otherwise sleeps for the server's Retry-After (up to six hours)
+    before every retry. As with the concurrent fetches, a Retry-After longer
+    than _MAX_RETRY_AFTER seconds ends the retries and the last response is
+    returned.
+    """
+    
+    def increment(self, method: Optional[str] = None, url: Optional[str] = None,
+                  response: Any = None, error: Optional[Exception] = None,
+                  _pool: Any = None, _stacktrace: Any = None) -> Retry:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and _retry_after_seconds(retry_after, 0) > _MAX_RETRY_AFTER:
+            logger.error("HTTP %s for URL %s, Retry-After of %s is too long, giving up",
+                         response.status, url, retry_after)
+            raise MaxRetryError(_pool, url, ResponseError(f"Retry-After of {retry_after} is too long"))
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class AsyncRateLimiter:
+    """
+    Token-bucket rate limiter for asyncio code
+    
+    Allows bursts of up to max_rate requests and then hands out tokens at
+    max_rate per time_period seconds. The limiter can be paused, e.g. when
+    the server answers with a Retry-After header.
+    """
+    
+    def __init__(self, max_rate: float, time_period: float = 1.0):
+        """
+        Initialize the limiter with a full bucket
+        
+        Args:
+            max_rate (float): Number of requests allowed per time period
+            time_period (float): Length of the time period in seconds
+        """
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = max_rate
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for the given number of seconds
+        
+        The bucket is emptied as well, so requests resume at the steady rate
+        instead of in a burst once the pause is over.
+        
+        Args:
+            seconds (float): How long to pause
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+        self._last_refill = self._paused_until
+    
+    async def acquire(self) -> None:
+        """
+        Wait until a request may be sent
+        
+        Waiters are served one at a time in arrival order.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                
+                # Refill the bucket for the time elapsed since the last call
+                elapsed = now - self._last_refill
+                self._tokens = min(self.max_rate, self._tokens + elapsed * self.max_rate / self.time_period)
+                self._last_refill = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.time_period / self.max_rate)
+
+
 class BookScraper:
     """
     A web scraper class for extracting book data from books.toscrape.com
@@ -43,25 +301,66 @@ class BookScraper:
     - CSV file generation
     """
     
-    def __init__(self, base_url: str = "http://books.toscrape.com/"):
+    def __init__(self, base_url: str = "http://books.toscrape.com/", parser: Optional[str] = None,
+                 cache: bool = False):
         """
         Initialize the BookScraper with base URL and session
         
         Args:
             base_url (str): The base URL of the website to scrape
+            parser (str): HTML parser to use: 'lexbor' (selectolax), or a BeautifulSoup
+                tree builder such as 'lxml' or 'html.parser'. Defaults to 'lexbor'
+                when selectolax is installed, otherwise 'lxml'.
+            cache (bool): If True, keep responses fetched through the requests session
+                in an SQLite cache (books_cache.sqlite) for an hour, so repeated
+                runs don't hit the network. Requires requests-cache.
         """
+        if parser is None:
+            parser = 'lexbor' if LexborHTMLParser is not None else 'lxml'
+        elif parser == 'lexbor' and LexborHTMLParser is None:
+            raise ValueError("The 'lexbor' parser requires selectolax to be installed")
+        
         self.base_url = base_url
-        self.session = requests.Session()
+        self.parser = parser  # Both lexbor and lxml are C parsers, much faster than html.parser
+        self.encoding = 'utf-8'  # Books to Scrape serves UTF-8; None lets BeautifulSoup detect it
+        if cache and requests_cache is None:
+            logger.warning("requests-cache is not installed, responses will not be cached")
+        if cache and requests_cache is not None:
+            self.session = requests_cache.CachedSession('books_cache', backend='sqlite', expire_after=3600)
+        else:
+            self.session = requests.Session()
+        # Keep connections alive in a pool large enough for concurrent use and
+        # retry transient failures with exponential backoff (or the server's
+        # Retry-After, up to _MAX_RETRY_AFTER seconds)
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=_CappedRetry(
+                total=5,
+                connect=2,  # Refused connections rarely recover within seconds
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"],
+                raise_on_status=False  # Let raise_for_status() report the final status
+            )
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         # Set a user agent to avoid being blocked
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
-        self.books_data = []  # List to store all scraped book data
-        self.request_delay = 1  # Delay between requests (in seconds) to be respectful
+        self.books_data = []  # List to store scraped book data for save_to_csv()
+        self.books_scraped = 0  # Number of books scraped by the last run
+        self.request_delay = 1  # Delay between sequential requests (in seconds) to be respectful
+        self.max_concurrency = 16  # Maximum number of pages fetched at the same time
+        self.max_requests_per_second = 5  # Rate limit for concurrent fetching
+        self.total_pages = None  # Number of catalogue pages; read from the homepage when None
+        self.parse_workers = None  # Processes parsing pages in parallel; None lets the pool use one per CPU
         
-    def get_page(self, url: str) -> Optional[BeautifulSoup]:
+    def get_page(self, url: str) -> Optional[Union[BeautifulSoup, 'LexborHTMLParser']]:
         """
-        Fetch a webpage and return BeautifulSoup object
+        Fetch a webpage and return its parsed HTML tree
         
         This method handles HTTP errors gracefully and retries on failures.
         
@@ -69,70 +368,146 @@ class BookScraper:
             url (str): The URL to fetch
             
         Returns:
-            BeautifulSoup: Parsed HTML content, or None if request fails
+            BeautifulSoup or LexborHTMLParser: Parsed HTML content, or None if request fails
         """
         response = None  # Initialize response variable
         try:
-            logger.info(f"Fetching page: {url}")
+            logger.info("Fetching page: %s", url)
             response = self.session.get(url, timeout=10)
             # Raise an exception for bad status codes
             response.raise_for_status()
             
             # Parse HTML content
-            soup = BeautifulSoup(response.content, 'html.parser')
-            return soup
+            return self.parse_html(response.content)
             
         except requests.exceptions.HTTPError as e:
             # Handle HTTP errors (404, 503, etc.)
             status_code = response.status_code if response else "unknown"
-            logger.error(f"HTTP error {status_code} for URL {url}: {e}")
+            logger.error("HTTP error %s for URL %s: %s", status_code, url, e)
             return None
         except requests.exceptions.ConnectionError as e:
             # Handle connection errors (DNS failures, network issues, etc.)
-            logger.error(f"Connection error for URL {url}: {e}")
+            logger.error("Connection error for URL %s: %s", url, e)
             return None
         except requests.exceptions.Timeout as e:
             # Handle timeout errors
-            logger.error(f"Timeout error for URL {url}: {e}")
+            logger.error("Timeout error for URL %s: %s", url, e)
             return None
         except requests.exceptions.RequestException as e:
             # Handle other request errors
-            logger.error(f"Request error for URL {url}: {e}")
+            logger.error("Request error for URL %s: %s", url, e)
             return None
         except Exception as e:
             # Handle any other unexpected errors
-            logger.error(f"Unexpected error fetching {url}: {e}")
+            logger.error("Unexpected error fetching %s: %s", url, e)
             return None
     
-    def extract_rating(self, rating_class: str) -> Optional[int]:
+    def parse_html(self, content: bytes) -> Union[BeautifulSoup, 'LexborHTMLParser']:
+        """
+        Parse raw HTML into a tree using the configured parser
+        
+        The bytes are decoded with self.encoding directly, which skips the
+        encoding detection BeautifulSoup would otherwise run on every page.
+        With BeautifulSoup only the book articles and the 'current'/'next'
+        pagination items are kept in the tree.
+        
+        Args:
+            content (bytes): Raw HTML body of a response
+            
+        Returns:
+            LexborHTMLParser for the 'lexbor' parser, otherwise BeautifulSoup
+        """
+        if self.parser == 'lexbor':
+            return LexborHTMLParser(content.decode(self.encoding or 'utf-8', errors='replace'))
+        return BeautifulSoup(content, self.parser, parse_only=_PAGE_STRAINER,
+                             from_encoding=self.encoding)
+    
+    def extract_rating(self, classes: List[str]) -> Optional[int]:
         """
-        Extract numeric rating from CSS class name
+        Extract numeric rating from CSS class names
         
         The website uses classes like 'star-rating One', 'star-rating Two', etc.
         This function converts them to numeric values (1-5).
         
         Args:
-            rating_class (str): CSS class string containing rating information
+            classes (list): CSS classes of the rating tag, e.g. ['star-rating', 'Three']
             
         Returns:
             int: Numeric rating (1-5), or None if not found
         """
-        rating_map = {
-            'One': 1,
-            'Two': 2,
-            'Three': 3,
-            'Four': 4,
-            'Five': 5
-        }
-        
-        # Extract rating from class string
-        for word, rating in rating_map.items():
-            if word in rating_class:
+        for cls in classes:
+            rating = _RATING_MAP.get(cls)
+            if rating is not None:
                 return rating
         
         return None
     
-    def extract_book_data(self, book_element) -> Optional[Dict[str, any]]:
+    def _soup_book_fields(self, book_element) -> Optional[tuple]:
+        """
+        Read the raw book fields from a BeautifulSoup element
+        
+        Args:
+            book_element: BeautifulSoup element containing book information
+            
+        Returns:
+            tuple: (title, href, price_text, rating_classes, availability_text), with
+                None for each missing field, or None if the title link is missing
+        """
+        # Title and product URL both come from the link inside the h3 tag
+        title_tag = book_element.find('h3')
+        link_tag = title_tag.find('a') if title_tag else None
+        if not link_tag:
+            return None
+        
+        # Walk the article's paragraphs once and pick the fields by CSS class,
+        # instead of searching the subtree again for every field
+        price_tag = rating_tag = availability_tag = None
+        for p_tag in book_element.find_all('p'):
+            classes = p_tag.get('class', [])
+            if price_tag is None and 'price_color' in classes:
+                price_tag = p_tag
+            elif rating_tag is None and 'star-rating' in classes:
+                rating_tag = p_tag
+            elif availability_tag is None and ('instock' in classes or 'outofstock' in classes):
+                availability_tag = p_tag
+        
+        return (
+            link_tag.get('title', ''),
+            link_tag.get('href'),
+            price_tag.get_text().strip() if price_tag else None,
+            rating_tag.get('class', []) if rating_tag else None,
+            availability_tag.get_text().strip() if availability_tag else None
+        )
+    
+    def _lexbor_book_fields(self, book_node) -> Optional[tuple]:
+        """
+        Read the raw book fields from a selectolax node
+        
+        Args:
+            book_node: selectolax node of an <article class="product_pod">
+            
+        Returns:
+            tuple: (title, href, price_text, rating_classes, availability_text), with
+                None for each missing field, or None if the title link is missing
+        """
+        link_node = book_node.css_first('h3 a')
+        if link_node is None:
+            return None
+        
+        link_attrs = link_node.attributes
+        price_node = book_node.css_first('p.price_color')
+        rating_node = book_node.css_first('p.star-rating')
+        availability_node = book_node.css_first('p.instock, p.outofstock')
+        
+        return (
+            link_attrs.get('title') or '',
+            link_attrs.get('href'),
+            price_node.text(strip=True) if price_node else None,
+            (rating_node.attributes.get('class') or '').split() if rating_node else None,
+            availability_node.text(strip=True) if availability_node else None
+        )
+    
+    def extract_book_data(self, book_element, page_url: Optional[str] = None) -> Optional[Book]:
         """
         Extract data from a single book element on the page
         
@@ -144,81 +519,70 @@ class BookScraper:
         - Product URL
         
         Args:
-            book_element: BeautifulSoup element containing book information
+            book_element: BeautifulSoup element (or selectolax node when using the
+                'lexbor' parser) containing book information
+            page_url (str): URL of the page the book was found on, used to resolve
+                the relative product link (defaults to the base URL)
             
         Returns:
-            dict: Dictionary containing book data, or None if extraction fails
+            Book: Record containing book data, or None if extraction fails
         """
         try:
-            book_data = {}
-            
-            # Extract title from h3 tag
-            title_tag = book_element.find('h3')
-            if title_tag and title_tag.find('a'):
-                book_data['Title'] = title_tag.find('a').get('title', '').strip()
+            if self.parser == 'lexbor':
+                fields = self._lexbor_book_fields(book_element)
             else:
+                fields = self._soup_book_fields(book_element)
+            
+            if fields is None:
                 logger.warning("Title not found for a book, skipping...")
                 return None
             
-            # Extract price from price_color class
-            price_tag = book_element.find('p', class_='price_color')
-            if price_tag:
-                # Remove currency symbol and convert to float
-                price_text = price_tag.get_text().strip()
-                # Remove '£' symbol and convert
+            title, relative_url, price_text, rating_classes, availability_text = fields
+            title = title.strip()
+            
+            # Convert price text such as '£51.77' to float
+            price = None
+            if price_text is not None:
                 try:
-                    book_data['Price'] = float(price_text.replace('£', ''))
+                    price = _parse_price(price_text)
                 except ValueError:
-                    logger.warning(f"Invalid price format: {price_text}")
-                    book_data['Price'] = None
-            else:
-                logger.warning(f"Price not found for book: {book_data.get('Title', 'Unknown')}")
-                book_data['Price'] = None
-            
-            # Extract rating from star-rating class
-            rating_tag = book_element.find('p', class_='star-rating')
-            if rating_tag:
-                rating_class = ' '.join(rating_tag.get('class', []))
-                book_data['Rating'] = self.extract_rating(rating_class)
+                    logger.warning("Invalid price format: %s", price_text)
             else:
-                logger.warning(f"Rating not found for book: {book_data.get('Title', 'Unknown')}")
-                book_data['Rating'] = None
+                logger.warning("Price not found for book: %s", title)
             
-            # Extract availability from instock/outofstock class
-            availability_tag = book_element.find('p', class_='instock')
-            if not availability_tag:
-                availability_tag = book_element.find('p', class_='outofstock')
+            # Convert star-rating class to a number
+            rating = None
+            if rating_classes is not None:
+                rating = self.extract_rating(rating_classes)
+            else:
+                logger.warning("Rating not found for book: %s", title)
             
-            if availability_tag:
-                availability_text = availability_tag.get_text().strip()
+            availability = None
+            if availability_text is not None:
                 # Normalize availability text
                 if 'In stock' in availability_text or 'instock' in availability_text.lower():
-                    book_data['Availability'] = 'In stock'
+                    availability = 'In stock'
                 elif 'Out of stock' in availability_text or 'outofstock' in availability_text.lower():
-                    book_data['Availability'] = 'Out of stock'
+                    availability = 'Out of stock'
                 else:
-                    book_data['Availability'] = availability_text
+                    availability = availability_text
             else:
-                logger.warning(f"Availability not found for book: {book_data.get('Title', 'Unknown')}")
-                book_data['Availability'] = None
+                logger.warning("Availability not found for book: %s", title)
             
-            # Extract product URL
-            link_tag = book_element.find('h3')
-            if link_tag and link_tag.find('a'):
-                relative_url = link_tag.find('a').get('href', '')
+            url = None
+            if relative_url:
                 # Convert relative URL to absolute URL
-                book_data['URL'] = urljoin(self.base_url, relative_url)
+                url = _join_url(page_url or self.base_url, relative_url)
             else:
-                logger.warning(f"URL not found for book: {book_data.get('Title', 'Unknown')}")
-                book_data['URL'] = None
+                logger.warning("URL not found for book: %s", title)
             
-            return book_data
+            return Book(title, price, rating, availability, url)
             
         except Exception as e:
-            logger.error(f"Error extracting book data: {e}")
+            logger.error("Error extracting book data: %s", e)
             return None
     
-    def scrape_page(self, url: str) -> List[Dict[str, any]]:
+    def scrape_page(self, url: str) -> List[Book]:
         """
         Scrape all books from a single page
         
@@ -226,23 +590,40 @@ class BookScraper:
             url (str): URL of the page to scrape
             
         Returns:
-            list: List of dictionaries containing book data from the page
+            list: List of Book records from the page
         """
         soup = self.get_page(url)
         if not soup:
             return []
         
+        return self.extract_books(soup, url)
+    
+    def extract_books(self, soup: Union[BeautifulSoup, 'LexborHTMLParser'],
+                      url: str) -> List[Book]:
+        """
+        Extract all books from an already parsed page
+        
+        Args:
+            soup (BeautifulSoup or LexborHTMLParser): Parsed HTML of the page
+            url (str): URL of the page, used for logging and resolving links
+            
+        Returns:
+            list: List of Book records from the page
+        """
         books = []
         
         # Find all book articles on the page
         # Books are contained in <article> tags with class 'product_pod'
-        book_elements = soup.find_all('article', class_='product_pod')
+        if self.parser == 'lexbor':
+            book_elements = soup.css('article.product_pod')
+        else:
+            book_elements = soup.find_all('article', class_='product_pod')
         
-        logger.info(f"Found {len(book_elements)} books on page: {url}")
+        logger.info("Found %s books on page: %s", len(book_elements), url)
         
         # Extract data from each book
         for book_element in book_elements:
-            book_data = self.extract_book_data(book_element)
+            book_data = self.extract_book_data(book_element, url)
             if book_data:
                 books.append(book_data)
             else:
@@ -250,7 +631,8 @@ class BookScraper:
         
         return books
     
-    def get_next_page_url(self, soup: BeautifulSoup, current_url: str) -> Optional[str]:
+    def get_next_page_url(self, soup: Union[BeautifulSoup, 'LexborHTMLParser'],
+                          current_url: str) -> Optional[str]:
         """
         Find the URL of the next page from pagination
         
@@ -258,7 +640,7 @@ class BookScraper:
         This method finds and constructs the next page URL.
         
         Args:
-            soup (BeautifulSoup): Parsed HTML of current page
+            soup (BeautifulSoup or LexborHTMLParser): Parsed HTML of current page
             current_url (str): URL of the current page
             
         Returns:
@@ -266,27 +648,226 @@ class BookScraper:
         """
         try:
             # Find the 'next' button in pagination
-            next_button = soup.find('li', class_='next')
-            if next_button and next_button.find('a'):
-                relative_url = next_button.find('a').get('href', '')
+            if self.parser == 'lexbor':
+                next_link = soup.css_first('li.next a')
+                relative_url = next_link.attributes.get('href') if next_link else None
+            else:
+                next_button = soup.find('li', class_='next')
+                next_link = next_button.find('a') if next_button else None
+                relative_url = next_link.get('href', '') if next_link else None
+            
+            if relative_url is not None:
                 # Construct absolute URL
-                next_url = urljoin(current_url, relative_url)
+                next_url = _join_url(current_url, relative_url)
                 return next_url
             return None
         except Exception as e:
-            logger.error(f"Error finding next page: {e}")
+            logger.error("Error finding next page: %s", e)
             return None
     
-    def scrape_all_pages(self) -> List[Dict[str, any]]:
+    def get_page_count(self, soup: Union[BeautifulSoup, 'LexborHTMLParser']) -> Optional[int]:
+        """
+        Read the total number of pages from the pagination label
+        
+        The website shows "Page 1 of 50" in an <li class="current"> element.
+        
+        Args:
+            soup (BeautifulSoup or LexborHTMLParser): Parsed HTML of a page
+            
+        Returns:
+            int: Total number of pages, or None if the label is not found
+        """
+        if self.parser == 'lexbor':
+            current = soup.css_first('li.current')
+            label = current.text() if current else None
+        else:
+            current = soup.find('li', class_='current')
+            label = current.get_text() if current else None
+        
+        match = _PAGE_COUNT_RE.search(label) if label else None
+        return int(match.group(1)) if match else None
+    
+    async def _fetch(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                     limiter: 'AsyncRateLimiter', url: str) -> Optional[bytes]:
+        """
+        Fetch a single page asynchronously
+        
+        At most max_concurrency fetches run at once, and every request first
+        takes a token from the shared rate limiter. A 429/503 response pauses
+        the limiter for the server's Retry-After time (or an exponential
+        backoff) and the request is retried. A Retry-After longer than
+        _MAX_RETRY_AFTER seconds drops the request instead of stalling the
+        whole scrape.
+        
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            semaphore (asyncio.Semaphore): Limits the number of requests in flight
+            limiter (AsyncRateLimiter): Limits the number of requests per second
+            url (str): The URL to fetch
+            
+        Returns:
+            bytes: Raw HTML content, or None if request fails
+        """
+        async with semaphore:
+            for attempt in range(_MAX_RATE_LIMIT_RETRIES + 1):
+                await limiter.acquire()
+                try:
+                    logger.info("Fetching page: %s", url)
+                    async with session.get(url) as response:
+                        if response.status in (429, 503) and attempt < _MAX_RATE_LIMIT_RETRIES:
+                            # The server asked us to slow down; hold back all requests
+                            delay = _retry_after_seconds(response.headers.get('Retry-After'), attempt)
+                            if delay > _MAX_RETRY_AFTER:
+                                logger.error("HTTP %s for URL %s, Retry-After of %.0fs is too long, giving up",
+                                             response.status, url, delay)
+                                return None
+                            logger.warning("HTTP %s for URL %s, retrying in %.1fs", response.status, url, delay)
+                            limiter.pause(delay)
+                            continue
+                        
+                        # Raise an exception for bad status codes
+                        response.raise_for_status()
+                        return await response.read()
+                except aiohttp.ClientResponseError as e:
+                    # Handle HTTP errors (404, 503, etc.)
+                    logger.error("HTTP error %s for URL %s: %s", e.status, url, e.message)
+                    return None
+                except asyncio.TimeoutError:
+                    # Handle timeout errors
+                    logger.error("Timeout error for URL %s", url)
+                    return None
+                except aiohttp.ClientError as e:
+                    # Handle connection and other request errors
+                    logger.error("Request error for URL %s: %s", url, e)
+                    return None
+        
+        return None
+    
+    async def _scrape_all_pages_async(self, writer: Optional[Any] = None) -> List[Book]:
         """
-        Scrape books from all pages by following pagination
+        Scrape the homepage and then all remaining catalogue pages concurrently
+        
+        The homepage is fetched first to read the number of pages from its
+        pagination ("Page 1 of 50"), unless total_pages is set. The URLs of
+        the remaining pages (catalogue/page-2.html onwards) are then generated
+        up front and fetched concurrently.
+        
+        Each downloaded page is parsed in a pool of parse_workers processes, so
+        parsing uses all CPUs while the event loop keeps downloading the
+        remaining pages. Rows are written from the event loop thread only, so
+        the writer never sees concurrent calls. Rows are written in page order:
+        a page that finishes early is held back until the pages before it have
+        been written. A page that fails to download or parse is logged and
+        skipped, as in get_page().
+        
+        Args:
+            writer (csv.writer): If given, each page's books are written as
+                soon as the page and all pages before it are parsed, instead of
+                being returned
+            
+        Returns:
+            list: List of all books scraped, in page order (empty when streaming)
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        limiter = AsyncRateLimiter(self.max_requests_per_second)
+        connector = aiohttp.TCPConnector(limit_per_host=self.max_concurrency)
+        timeout = aiohttp.ClientTimeout(total=10)
+        
+        pages = []  # Books of each page in page order (empty lists when streaming)
+        finished = {}  # Pages parsed before an earlier page, by page index
+        
+        def collect(index: int, page_books: List[Book]) -> None:
+            self.books_scraped += len(page_books)
+            finished[index] = page_books
+            # Hand on every page whose earlier pages are all done
+            while len(pages) in finished:
+                ready = finished.pop(len(pages))
+                if writer is not None:
+                    writer.writerows(ready)
+                    ready = []
+                pages.append(ready)
+        
+        with ProcessPoolExecutor(max_workers=self.parse_workers, initializer=_init_parse_worker,
+                                 initargs=(self.base_url, self.parser, self.encoding)) as pool:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                             headers=dict(self.session.headers)) as session:
+                async def scrape(index: int, url: str) -> None:
+                    content = await self._fetch(session, semaphore, limiter, url)
+                    page_books = []
+                    if content is not None:
+                        try:
+                            page_books = await loop.run_in_executor(pool, _parse_page, url, content)
+                        except Exception as e:
+                            # Also raised for every page once a worker process has died
+                            logger.error("Error parsing page %s: %s", url, e)
+                    collect(index, page_books)
+                
+                # The homepage is page 1 and tells us how many pages there are
+                content = await self._fetch(session, semaphore, limiter, self.base_url)
+                if content is None:
+                    return []
+                try:
+                    first_books, page_count = await loop.run_in_executor(
+                        pool, _parse_first_page, self.base_url, content)
+                except Exception as e:
+                    logger.error("Error parsing page %s: %s", self.base_url, e)
+                    return []
+                collect(0, first_books)
+                
+                total_pages = self.total_pages or page_count
+                if total_pages is None:
+                    logger.warning("Page count not found on the homepage, scraping it only")
+                    total_pages = 1
+                logger.info("Scraping %s pages concurrently...", total_pages)
+                
+                urls = [_join_url(self.base_url, f"catalogue/page-{n}.html")
+                        for n in range(2, total_pages + 1)]
+                await asyncio.gather(*(scrape(index, url) for index, url in enumerate(urls, start=1)))
+        
+        return [book for page_books in pages for book in page_books]
+    
+    def scrape_all_pages(self, concurrent: bool = True,
+                         writer: Optional[Any] = None) -> List[Book]:
+        """
+        Scrape books from all pages
+        
+        By default the homepage is scraped first to learn the number of pages,
+        then catalogue/page-2.html to catalogue/page-<N>.html are fetched
+        concurrently. With concurrent=False the method instead starts from the
+        homepage and follows pagination links until all pages are scraped.
+        
+        When called from a running event loop (e.g. in Jupyter), the concurrent
+        scrape runs on its own event loop in a worker thread, and the call
+        blocks until it finishes like the sequential scrape does.
         
-        This method starts from the homepage and follows pagination links
-        until all pages are scraped.
+        The number of books scraped is kept in self.books_scraped.
+        
+        Args:
+            concurrent (bool): If True, fetch the numbered pages concurrently.
+                If False, follow the 'next' links one page at a time.
+            writer (csv.writer): If given, books are written page by page as
+                they are scraped (in page order, also when concurrent) and are
+                not kept in memory
         
         Returns:
-            list: List of all books scraped from all pages
+            list: List of all books scraped from all pages (empty when a writer is given)
         """
+        self.books_scraped = 0
+        
+        if concurrent:
+            logger.info("Starting to scrape all pages concurrently...")
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                all_books = asyncio.run(self._scrape_all_pages_async(writer))
+            else:
+                # asyncio.run() cannot be nested inside a running loop
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    all_books = executor.submit(asyncio.run, self._scrape_all_pages_async(writer)).result()
+            logger.info("Scraping completed. Total books scraped: %s", self.books_scraped)
+            return all_books
+        
         all_books = []
         current_url = self.base_url
         page_number = 1
@@ -294,36 +875,82 @@ class BookScraper:
         logger.info("Starting to scrape all pages...")
         
         while current_url:
-            logger.info(f"Scraping page {page_number}: {current_url}")
+            logger.info("Scraping page %s: %s", page_number, current_url)
+            request_started = time.monotonic()
+            
+            # Fetch the page once and use it for both the books and the next link
+            soup = self.get_page(current_url)
+            if not soup:
+                break
             
-            # Scrape current page
-            page_books = self.scrape_page(current_url)
-            all_books.extend(page_books)
+            page_books = self.extract_books(soup, current_url)
+            self.books_scraped += len(page_books)
+            if writer is not None:
+                writer.writerows(page_books)
+            else:
+                all_books.extend(page_books)
             
-            logger.info(f"Scraped {len(page_books)} books from page {page_number}. Total so far: {len(all_books)}")
+            logger.info("Scraped %s books from page %s. Total so far: %s",
+                        len(page_books), page_number, self.books_scraped)
             
             # Get next page URL
-            soup = self.get_page(current_url)
-            if soup:
-                next_url = self.get_next_page_url(soup, current_url)
-                current_url = next_url
-                page_number += 1
-                
-                # Add delay between requests to be respectful to the server
-                if current_url:
-                    time.sleep(self.request_delay)
-            else:
-                break
+            current_url = self.get_next_page_url(soup, current_url)
+            page_number += 1
+            
+            # Keep requests at least request_delay apart to be respectful to the
+            # server, counting the time already spent fetching and parsing
+            if current_url:
+                remaining = self.request_delay - (time.monotonic() - request_started)
+                if remaining > 0:
+                    time.sleep(remaining)
         
-        logger.info(f"Scraping completed. Total books scraped: {len(all_books)}")
+        logger.info("Scraping completed. Total books scraped: %s", self.books_scraped)
         return all_books
     
+    @contextmanager
+    def csv_writer(self, filename: str = "books_data.csv") -> Iterator[Any]:
+        """
+        Open a CSV file for writing book rows
+        
+        Rows go to a temporary file next to filename, opened once with a 1 MiB
+        write buffer, and the header row (Title, Price, Rating, Availability,
+        URL) is written before the writer is handed out. When the block
+        finishes the temporary file atomically replaces filename, so readers
+        never see a half-written file. If the block raises or writes no rows,
+        the temporary file is discarded and any existing file is left as is.
+        
+        Args:
+            filename (str): Name of the CSV file to create
+            
+        Yields:
+            csv.writer: Writer accepting Book records as rows
+        """
+        tmp_filename = filename + '.tmp'
+        try:
+            with open(tmp_filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+                writer = csv.writer(csvfile)
+                
+                # Write header row
+                writer.writerow(CSV_FIELDNAMES)
+                header_end = csvfile.tell()
+                yield writer
+                has_rows = csvfile.tell() != header_end
+            
+            if has_rows:
+                os.replace(tmp_filename, filename)
+        finally:
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+    
     def save_to_csv(self, filename: str = "books_data.csv") -> bool:
         """
         Save scraped book data to a CSV file
         
         The CSV file will have columns: Title, Price, Rating, Availability, URL
         
+        self.books_data may hold Book records or dicts keyed by those column
+        names; each dict must have all five keys.
+        
         Args:
             filename (str): Name of the CSV file to create
             
@@ -335,61 +962,106 @@ class BookScraper:
             return False
         
         try:
-            # Define CSV columns
-            fieldnames = ['Title', 'Price', 'Rating', 'Availability', 'URL']
+            with self.csv_writer(filename) as writer:
+                # Write all book data rows in one call, putting dict values in column order
+                writer.writerows(Book(**book) if isinstance(book, dict) else book
+                                 for book in self.books_data)
             
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                # Write header row
-                writer.writeheader()
-                
-                # Write book data rows
-                for book in self.books_data:
-                    writer.writerow(book)
-            
-            logger.info(f"Successfully saved {len(self.books_data)} books to {filename}")
+            logger.info("Successfully saved %s books to %s", len(self.books_data), filename)
             return True
             
         except Exception as e:
-            logger.error(f"Error saving to CSV: {e}")
+            logger.error("Error saving to CSV: %s", e)
             return False
     
-    def run(self, scrape_all: bool = True) -> bool:
+    def run(self, scrape_all: bool = True, filename: str = "books_data.csv") -> bool:
         """
         Main method to run the scraper
         
         This method orchestrates the entire scraping process:
         1. Scrapes books (homepage only or all pages)
-        2. Saves data to CSV
+        2. Streams each page's books to the CSV file as it is scraped
+        
+        The number of books written is available in self.books_scraped.
         
         Args:
             scrape_all (bool): If True, scrape all pages. If False, scrape only homepage.
+            filename (str): Name of the CSV file to create
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            if scrape_all:
-                # Scrape all pages
-                self.books_data = self.scrape_all_pages()
-            else:
-                # Scrape only homepage (20 books)
-                logger.info("Scraping homepage only...")
-                self.books_data = self.scrape_page(self.base_url)
+            with self.csv_writer(filename) as writer:
+                if scrape_all:
+                    # Scrape all pages
+                    self.scrape_all_pages(writer=writer)
+                else:
+                    # Scrape only homepage (20 books)
+                    logger.info("Scraping homepage only...")
+                    books = self.scrape_page(self.base_url)
+                    self.books_scraped = len(books)
+                    writer.writerows(books)
             
-            # Save to CSV
-            if self.books_data:
-                return self.save_to_csv()
+            if self.books_scraped:
+                logger.info("Successfully saved %s books to %s", self.books_scraped, filename)
+                return True
             else:
                 logger.error("No books were scraped.")
                 return False
                 
         except Exception as e:
-            logger.error(f"Error in scraper run: {e}")
+            logger.error("Error in scraper run: %s", e)
             return False
 
 
+# Scraper used by a parse worker process, created once per process
+_worker_scraper = None
+
+
+def _init_parse_worker(base_url: str, parser: str, encoding: Optional[str]) -> None:
+    """
+    Create the scraper used to parse pages inside a worker process
+    
+    Args:
+        base_url (str): The base URL of the website being scraped
+        parser (str): HTML parser to use
+        encoding (str): Encoding used to decode page bytes, as on the parent scraper
+    """
+    global _worker_scraper
+    _worker_scraper = BookScraper(base_url, parser=parser)
+    _worker_scraper.encoding = encoding
+
+
+def _parse_first_page(url: str, content: bytes) -> Tuple[List[Book], Optional[int]]:
+    """
+    Parse the first page inside a worker process, also reading the page count
+    
+    Args:
+        url (str): URL of the page
+        content (bytes): Raw HTML content of the page
+        
+    Returns:
+        tuple: (list of Book records, total number of pages or None)
+    """
+    soup = _worker_scraper.parse_html(content)
+    return _worker_scraper.extract_books(soup, url), _worker_scraper.get_page_count(soup)
+
+
+def _parse_page(url: str, content: bytes) -> List[Book]:
+    """
+    Parse a downloaded page and extract its books inside a worker process
+    
+    Args:
+        url (str): URL of the page
+        content (bytes): Raw HTML content of the page
+        
+    Returns:
+        list: List of Book records from the page
+    """
+    return _worker_scraper.extract_books(_worker_scraper.parse_html(content), url)
+
+
 def main():
     """
     Main entry point for the script
@@ -403,7 +1075,7 @@ def main():
     
     if success:
         print(f"\n✓ Scraping completed successfully!")
-        print(f"✓ Total books scraped: {len(scraper.books_data)}")
+        print(f"✓ Total books scraped: {scraper.books_scraped}")
         print(f"✓ Data saved to: books_data.csv")
     else:
         print("\n✗ Scraping failed. Check scraper.log for details.")
@@ -14,15 +14,118 @@ Date: 2024
 """
 
 import unittest
+from unittest import mock
 import os
 import csv
 import sys
-from book_scraper import BookScraper
+import time
+import asyncio
+import tempfile
+import threading
+from contextlib import contextmanager
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urljoin
+import aiohttp
+import book_scraper
+from book_scraper import (BookScraper, Book, AsyncRateLimiter, _join_url, _parse_page,
+                          _parse_price, _retry_after_seconds)
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 
+@contextmanager
+def serve_locally(responses):
+    """
+    Serve canned responses from a local HTTP server in a background thread
+    
+    Args:
+        responses (dict): Maps request paths to a (status, headers, body) tuple,
+            or to a list of them served in turn with the last one repeated;
+            other paths get a 404
+    
+    Yields:
+        str: Base URL of the server, ending with '/'
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            response = responses.get(self.path, (404, {}, b''))
+            if isinstance(response, list):
+                response = response.pop(0) if len(response) > 1 else response[0]
+            status, headers, body = response
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def catalogue_pages(page_count, books_per_page=2):
+    """
+    Build responses for serve_locally() mimicking the site's catalogue
+    
+    Args:
+        page_count (int): Number of catalogue pages, the homepage being page 1
+        books_per_page (int): Number of books listed on each page
+    
+    Returns:
+        dict: Responses for the homepage and catalogue/page-2.html onwards
+    """
+    responses = {}
+    for page in range(1, page_count + 1):
+        prefix = 'catalogue/' if page == 1 else ''
+        articles = ''.join(
+            '<li><article class="product_pod"><p class="star-rating Three"></p>'
+            f'<h3><a href="{prefix}book-{page}-{n}_{n}/index.html" title="Book {page}-{n}">Book</a></h3>'
+            f'<p class="price_color">\u00a3{page}.{n:02d}</p><p class="instock availability">In stock</p>'
+            '</article></li>'
+            for n in range(books_per_page)
+        )
+        pager = f'<li class="current">Page {page} of {page_count}</li>'
+        if page < page_count:
+            pager += f'<li class="next"><a href="{prefix}page-{page + 1}.html">next</a></li>'
+        body = f'<html><body><ol class="row">{articles}</ol><ul class="pager">{pager}</ul></body></html>'
+        path = '/' if page == 1 else f'/catalogue/page-{page}.html'
+        responses[path] = (200, {'Content-Type': 'text/html; charset=utf-8'}, body.encode('utf-8'))
+    return responses
+
+
+def parse_page_failing_on_page_3(url, content):
+    """
+    Parse a page in a worker process like _parse_page, but fail on page 3
+    
+    Defined at module level so the process pool can pickle it.
+    """
+    if url.endswith('/page-3.html'):
+        raise ValueError("cannot parse page 3")
+    return _parse_page(url, content)
+
+
+def parse_page_slowly_on_page_2(url, content):
+    """
+    Parse a page in a worker process like _parse_page, but finish page 2 last
+    
+    Defined at module level so the process pool can pickle it.
+    """
+    if url.endswith('/page-2.html'):
+        time.sleep(0.5)
+    return _parse_page(url, content)
+
+
 class TestBookScraper(unittest.TestCase):
     """
     Test class for BookScraper functionality
@@ -37,7 +140,8 @@ class TestBookScraper(unittest.TestCase):
         This method initializes a BookScraper instance and sets up
         test data for each test case.
         """
-        self.scraper = BookScraper()
+        # Cache responses so the test cases don't refetch the homepage each time
+        self.scraper = BookScraper(cache=True)
         self.test_csv_file = "test_books_data.csv"
         
         # Clean up any existing test files
@@ -324,6 +428,457 @@ class TestBookScraper(unittest.TestCase):
             print(f"✓ {rows_with_missing_data} rows have some missing fields (acceptable)")
             print(f"✓ No crashes occurred during scraping")
     
+    def test_extract_rating(self):
+        """
+        Additional Test: Verify Rating Conversion
+        
+        This test verifies that the star-rating CSS classes are converted
+        to numeric ratings, and that unknown classes give None.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: Rating Conversion")
+        print("="*60)
+        
+        self.assertEqual(self.scraper.extract_rating(['star-rating', 'One']), 1)
+        self.assertEqual(self.scraper.extract_rating(['star-rating', 'Three']), 3)
+        self.assertEqual(self.scraper.extract_rating(['star-rating', 'Five']), 5)
+        self.assertIsNone(self.scraper.extract_rating(['star-rating']))
+        self.assertIsNone(self.scraper.extract_rating([]))
+        print("✓ Rating classes converted correctly")
+    
+    def test_price_parsing(self):
+        """
+        Additional Test: Verify Price Parsing
+        
+        This test verifies that prices are converted to floats with or
+        without the currency symbol, and that invalid prices raise ValueError.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: Price Parsing")
+        print("="*60)
+        
+        self.assertEqual(_parse_price('£51.77'), 51.77)
+        self.assertEqual(_parse_price('£0.99'), 0.99)
+        self.assertEqual(_parse_price('12.50'), 12.5)
+        self.assertEqual(_parse_price(' 12.50£'), 12.5)
+        for invalid in ('', '£', 'N/A', 'Â£51.77'):
+            with self.assertRaises(ValueError):
+                _parse_price(invalid)
+        print("✓ Prices parsed correctly")
+    
+    def test_url_resolution(self):
+        """
+        Additional Test: Verify URL Resolution
+        
+        This test verifies that product and pagination links resolve to the
+        same absolute URLs as urljoin, including on catalogue pages where the
+        links are relative to the catalogue/ directory.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: URL Resolution")
+        print("="*60)
+        
+        pages = [
+            "http://books.toscrape.com/",
+            "http://books.toscrape.com",
+            "http://books.toscrape.com/catalogue/page-2.html",
+            "http://books.toscrape.com/catalogue/category/books/travel_2/index.html",
+            "http://books.toscrape.com/index.html?page=2",
+            "HTTP://books.toscrape.com/catalogue/page-2.html",
+            "http://books.toscrape.com\t/catalogue/page-2.html",
+        ]
+        links = [
+            "catalogue/a-light-in-the-attic_1000/index.html",
+            "a-light-in-the-attic_1000/index.html",
+            "page-3.html",
+            "../../../its-only-the-himalayas_981/index.html",
+            "/catalogue/page-1.html",
+            "http://example.com/other",
+            "?page=3",
+            "",
+            " page-3.html",
+            "page-3.html\n",
+            "page\t-3.html",
+            ".",
+            "a/./b.html",
+            "a//b.html",
+            ";",
+            "page-3.html;x",
+        ]
+        for page in pages:
+            for link in links:
+                self.assertEqual(_join_url(page, link), urljoin(page, link),
+                                 f"{link!r} on {page!r} should resolve like urljoin")
+        print("✓ Links resolve like urljoin")
+    
+    def test_page_encoding_in_workers(self):
+        """
+        Additional Test: Verify Page Encoding in Parse Workers
+        
+        This test verifies that pages parsed in the worker processes of the
+        concurrent scrape are decoded with the scraper's encoding, giving the
+        same records as scraping the page directly. The latin-1 title is
+        also valid UTF-8, so decoding it as UTF-8 would give a different title.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: Page Encoding in Parse Workers")
+        print("="*60)
+        
+        page = (
+            '<html><body><ol><li><article class="product_pod">'
+            '<p class="star-rating Two"></p>'
+            '<h3><a href="caf-cr-me_1/index.html" title="Caf\u00c3\u00a9 Cr\u00c3\u00a8me">Caf</a></h3>'
+            '<p class="price_color">12.50</p>'
+            '<p class="instock availability">In stock</p>'
+            '</article></li></ol><ul class="pager"><li class="current">Page 1 of 1</li></ul>'
+            '</body></html>'
+        ).encode('latin-1')
+        responses = {'/': (200, {'Content-Type': 'text/html'}, page)}
+        
+        with serve_locally(responses) as base_url:
+            scraper = BookScraper(base_url, parser='html.parser')
+            scraper.encoding = 'latin-1'
+            direct_books = scraper.scrape_page(base_url)
+            concurrent_books = scraper.scrape_all_pages()
+        
+        self.assertEqual(len(direct_books), 1)
+        self.assertEqual(direct_books[0].Title, 'Caf\u00c3\u00a9 Cr\u00c3\u00a8me')
+        self.assertEqual(direct_books[0].Price, 12.5)
+        self.assertEqual(concurrent_books, direct_books)
+        print("✓ Worker processes decode pages with the scraper's encoding")
+    
+    def test_scrape_from_running_event_loop(self):
+        """
+        Additional Test: Verify Scraping From a Running Event Loop
+        
+        This test verifies that the concurrent scrape also works when called
+        from inside a running event loop, as in Jupyter or an async program,
+        and returns the same books as following the pagination links.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: Scraping From a Running Event Loop")
+        print("="*60)
+        
+        with serve_locally(catalogue_pages(3)) as base_url, tempfile.TemporaryDirectory() as tmp_dir:
+            scraper = BookScraper(base_url)
+            scraper.request_delay = 0
+            expected_books = scraper.scrape_all_pages(concurrent=False)
+            path = os.path.join(tmp_dir, 'books.csv')
+            
+            async def scrape_in_loop():
+                return scraper.scrape_all_pages(), scraper.run(filename=path)
+            
+            books, success = asyncio.run(scrape_in_loop())
+            self.assertEqual(len(expected_books), 6)
+            self.assertEqual(books, expected_books)
+            self.assertTrue(success)
+            self.assertEqual(scraper.books_scraped, 6)
+        print("✓ Concurrent scrape works inside a running event loop")
+    
+    def test_concurrent_scrape_skips_failed_page(self):
+        """
+        Additional Test: Verify a Failed Page Does Not Stop the Scrape
+        
+        This test verifies that when one page fails to parse in the worker
+        processes, the concurrent scrape logs it, skips that page and still
+        writes the books of every other page.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: Skipping a Page That Fails to Parse")
+        print("="*60)
+        
+        with serve_locally(catalogue_pages(4)) as base_url, tempfile.TemporaryDirectory() as tmp_dir:
+            scraper = BookScraper(base_url)
+            path = os.path.join(tmp_dir, 'books.csv')
+            with mock.patch('book_scraper._parse_page', parse_page_failing_on_page_3):
+                self.assertTrue(scraper.run(filename=path))
+            
+            with open(path, newline='', encoding='utf-8') as f:
+                titles = sorted(row['Title'] for row in csv.DictReader(f))
+        
+        self.assertEqual(scraper.books_scraped, 6)
+        self.assertEqual(titles, ['Book 1-0', 'Book 1-1', 'Book 2-0', 'Book 2-1', 'Book 4-0', 'Book 4-1'])
+        print("✓ Books of the other pages are still saved")
+    
+    def test_concurrent_scrape_page_order(self):
+        """
+        Additional Test: Verify Concurrent Rows Are in Page Order
+        
+        This test verifies that the concurrent scrape writes rows in the same
+        order as following the pagination links, even when a page finishes
+        after the pages behind it.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: Page Order of Concurrent Rows")
+        print("="*60)
+        
+        with serve_locally(catalogue_pages(5)) as base_url, tempfile.TemporaryDirectory() as tmp_dir:
+            scraper = BookScraper(base_url)
+            scraper.request_delay = 0
+            scraper.parse_workers = 4
+            expected_titles = [book.Title for book in scraper.scrape_all_pages(concurrent=False)]
+            path = os.path.join(tmp_dir, 'books.csv')
+            with mock.patch('book_scraper._parse_page', parse_page_slowly_on_page_2):
+                self.assertTrue(scraper.run(filename=path))
+            
+            with open(path, newline='', encoding='utf-8') as f:
+                titles = [row['Title'] for row in csv.DictReader(f)]
+        
+        self.assertEqual(len(expected_titles), 10)
+        self.assertEqual(titles, expected_titles)
+        print("✓ Rows are written in page order")
+    
+    def test_retry_after_parsing(self):
+        """
+        Additional Test: Verify Retry-After Parsing
+        
+        This test verifies that Retry-After headers given in seconds or as an
+        HTTP date are converted to a delay, and that missing or invalid values
+        fall back to exponential backoff.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: Retry-After Parsing")
+        print("="*60)
+        
+        self.assertEqual(_retry_after_seconds('5', 0), 5.0)
+        self.assertEqual(_retry_after_seconds('1.5', 2), 1.5)
+        self.assertEqual(_retry_after_seconds('-3', 0), 0.0)
+        
+        http_date = formatdate(time.time() + 30, usegmt=True)
+        self.assertAlmostEqual(_retry_after_seconds(http_date, 0), 30, delta=2)
+        past_date = formatdate(time.time() - 30, usegmt=True)
+        self.assertEqual(_retry_after_seconds(past_date, 0), 0.0)
+        
+        for attempt, backoff in enumerate((0.5, 1.0, 2.0)):
+            self.assertEqual(_retry_after_seconds(None, attempt), backoff)
+            self.assertEqual(_retry_after_seconds('', attempt), backoff)
+            self.assertEqual(_retry_after_seconds('soon', attempt), backoff)
+        print("✓ Retry-After values converted correctly")
+    
+    def test_rate_limiter(self):
+        """
+        Additional Test: Verify Rate Limiter
+        
+        This test verifies that the token bucket allows a burst of max_rate
+        requests, then waits 1/max_rate seconds per request, and that pause()
+        holds back every waiting request. The limiter runs on a fake clock, so
+        the timings are exact however busy the machine is (the rates and pauses
+        are chosen to be exact binary fractions).
+        """
+        print("\n" + "="*60)
+        print("Additional Test: Rate Limiter")
+        print("="*60)
+        
+        real_sleep = asyncio.sleep
+        
+        class FakeClock:
+            """Clock that only moves forward when the limiter sleeps"""
+            
+            def __init__(self):
+                self.now = 0.0
+            
+            def monotonic(self):
+                return self.now
+            
+            async def sleep(self, seconds):
+                self.now += seconds
+                await real_sleep(0)
+        
+        def acquire_times(max_rate, count, pause=None):
+            clock = FakeClock()
+            
+            async def acquire_all():
+                limiter = AsyncRateLimiter(max_rate)
+                if pause is not None:
+                    limiter.pause(pause)
+                
+                async def acquire():
+                    await limiter.acquire()
+                    return clock.now
+                
+                return await asyncio.gather(*(acquire() for _ in range(count)))
+            
+            with mock.patch('book_scraper.time', clock), mock.patch('asyncio.sleep', clock.sleep):
+                return asyncio.run(acquire_all())
+        
+        # A full bucket of 4 is used up at once, then one request every 1/4s
+        self.assertEqual(acquire_times(4, 7), [0, 0, 0, 0, 0.25, 0.5, 0.75])
+        
+        # A pause holds back every waiter, then they resume at the steady rate
+        self.assertEqual(acquire_times(4, 3, pause=0.5), [0.75, 1.0, 1.25])
+        print("✓ Requests are rate limited and paused correctly")
+    
+    def test_rate_limit_retry(self):
+        """
+        Additional Test: Verify Retrying Rate-Limited Requests
+        
+        This test verifies that a 429 response is retried after its Retry-After
+        delay, and that a request whose Retry-After exceeds the cap is dropped
+        right away instead of stalling the scrape.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: Retrying Rate-Limited Requests")
+        print("="*60)
+        
+        responses = {
+            '/retry': [(429, {'Retry-After': '0.2'}, b''), (200, {}, b'<html>ok</html>')],
+            '/blocked': (429, {'Retry-After': '3600'}, b''),
+        }
+        
+        async def fetch(base_url, path):
+            async with aiohttp.ClientSession() as session:
+                return await self.scraper._fetch(session, asyncio.Semaphore(1),
+                                                 AsyncRateLimiter(10), base_url + path)
+        
+        with serve_locally(responses) as base_url:
+            start = time.monotonic()
+            self.assertEqual(asyncio.run(fetch(base_url, 'retry')), b'<html>ok</html>')
+            self.assertGreaterEqual(time.monotonic() - start, 0.2)
+            
+            start = time.monotonic()
+            self.assertIsNone(asyncio.run(fetch(base_url, 'blocked')))
+            self.assertLess(time.monotonic() - start, 5)
+        print("✓ Rate-limited requests are retried or dropped correctly")
+    
+    def test_csv_writer_keeps_existing_file(self):
+        """
+        Additional Test: Verify CSV Writes Are Atomic
+        
+        This test verifies that an existing CSV file is only replaced when the
+        csv_writer block finishes with rows written: an exception or a
+        header-only run leaves the old content, and no .tmp file is left behind.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: Atomic CSV Writes")
+        print("="*60)
+        
+        book = Book('A Light in the Attic', 51.77, 3, 'In stock',
+                    'http://books.toscrape.com/catalogue/a-light-in-the-attic_1000/index.html')
+        old_content = 'Title,Price,Rating,Availability,URL\r\nOld Book,1.0,1,In stock,old\r\n'
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'books.csv')
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                f.write(old_content)
+            
+            def read_file():
+                with open(path, newline='', encoding='utf-8') as f:
+                    return f.read()
+            
+            # The block fails after writing a row
+            with self.assertRaises(RuntimeError):
+                with self.scraper.csv_writer(path) as writer:
+                    writer.writerow(book)
+                    raise RuntimeError("scrape failed")
+            self.assertEqual(read_file(), old_content)
+            self.assertFalse(os.path.exists(path + '.tmp'))
+            
+            # The block finishes without writing any rows
+            with self.scraper.csv_writer(path):
+                pass
+            self.assertEqual(read_file(), old_content)
+            self.assertFalse(os.path.exists(path + '.tmp'))
+            
+            # The block finishes with rows, so the file is replaced
+            with self.scraper.csv_writer(path) as writer:
+                writer.writerow(book)
+            with open(path, newline='', encoding='utf-8') as f:
+                rows = list(csv.reader(f))
+            self.assertEqual(rows, [list(Book._fields), [str(value) for value in book]])
+            self.assertFalse(os.path.exists(path + '.tmp'))
+        print("✓ Existing CSV file is only replaced by a complete write")
+    
+    def test_save_to_csv_rows(self):
+        """
+        Additional Test: Verify save_to_csv Row Types
+        
+        This test verifies that save_to_csv writes the same CSV for Book
+        records and for dicts keyed by the column names, and that a dict
+        missing a column fails instead of writing a corrupt file.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: save_to_csv Row Types")
+        print("="*60)
+        
+        book = Book('A Light in the Attic', 51.77, 3, 'In stock',
+                    'http://books.toscrape.com/catalogue/a-light-in-the-attic_1000/index.html')
+        expected_rows = [list(Book._fields), [str(value) for value in book]]
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'books.csv')
+            for books_data in ([book], [book._asdict()], [dict(reversed(book._asdict().items()))]):
+                self.scraper.books_data = books_data
+                self.assertTrue(self.scraper.save_to_csv(path))
+                with open(path, newline='', encoding='utf-8') as f:
+                    self.assertEqual(list(csv.reader(f)), expected_rows)
+                os.remove(path)
+            
+            self.scraper.books_data = [{'Title': 'No Price'}]
+            self.assertFalse(self.scraper.save_to_csv(path))
+            self.assertFalse(os.path.exists(path))
+        print("✓ Book records and dicts are saved the same way")
+    
+    def test_page_count(self):
+        """
+        Additional Test: Verify Page Count Parsing
+        
+        This test verifies that the number of pages is read from the
+        "Page 1 of 50" pagination label with both the lexbor and lxml
+        parsers, which also checks that the lxml strainer keeps li.current,
+        and that pages without the label give None.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: Page Count Parsing")
+        print("="*60)
+        
+        with_pager = (
+            b'<html><body><section><ol class="row"></ol><div><ul class="pager">'
+            b'<li class="current">\n            Page 1 of 50\n        </li>'
+            b'<li class="next"><a href="catalogue/page-2.html">next</a></li>'
+            b'</ul></div></section></body></html>'
+        )
+        without_pager = b'<html><body><section><ol class="row"></ol></section></body></html>'
+        
+        parsers = ['lxml']
+        if book_scraper.LexborHTMLParser is not None:
+            parsers.append('lexbor')
+        for parser in parsers:
+            with self.subTest(parser=parser):
+                scraper = BookScraper(parser=parser)
+                self.assertEqual(scraper.get_page_count(scraper.parse_html(with_pager)), 50)
+                self.assertIsNone(scraper.get_page_count(scraper.parse_html(without_pager)))
+        print(f"✓ Page count parsed correctly with {', '.join(parsers)}")
+    
+    def test_rate_limit_retry_sequential(self):
+        """
+        Additional Test: Verify Retrying Rate-Limited Sequential Requests
+        
+        This test verifies that get_page retries a 503 response after its
+        Retry-After delay, and that a Retry-After above the cap makes it give
+        up right away instead of sleeping before every retry.
+        """
+        print("\n" + "="*60)
+        print("Additional Test: Retrying Rate-Limited Sequential Requests")
+        print("="*60)
+        
+        page = b'<html><body><ul class="pager"><li class="current">Page 1 of 7</li></ul></body></html>'
+        responses = {
+            '/retry': [(503, {'Retry-After': '1'}, b''), (200, {'Content-Type': 'text/html'}, page)],
+            '/blocked': (503, {'Retry-After': '3600'}, b''),
+        }
+        scraper = BookScraper()
+        
+        with serve_locally(responses) as base_url:
+            start = time.monotonic()
+            soup = scraper.get_page(base_url + 'retry')
+            self.assertGreaterEqual(time.monotonic() - start, 1)
+            self.assertEqual(scraper.get_page_count(soup), 7)
+            
+            start = time.monotonic()
+            self.assertIsNone(scraper.get_page(base_url + 'blocked'))
+            self.assertLess(time.monotonic() - start, 5)
+        print("✓ Rate-limited sequential requests are retried or dropped correctly")
+    
     def test_scraper_error_handling(self):
         """
         Additional Test: Verify HTTP Error Handling